@@ -1,9 +1,27 @@
+import re
 import sys
-from tabulate import tabulate
+import unicodedata
+
+# Matches one grammar line with surrounding whitespace stripped, skipping
+# blank lines and '#' comments
+GRAMMAR_LINE_PATTERN = re.compile(r'^\s*([^#\s][^\n]*?)\s*$', re.M)
+
+def display_width(text):
+    """Returns the terminal column width of text: wide/fullwidth characters take 2, combining marks 0."""
+    if text.isascii():
+        return len(text)
+    width = 0
+    for char in text:
+        if unicodedata.combining(char):
+            continue
+        width += 2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1
+    return width
 
 # Data Structure for the Parse Tree
 class ParseTreeNode:
     """A node for constructing the parse tree."""
+    __slots__ = ('value', 'children', 'parent')
+
     def __init__(self, value, children=None):
         self.value = value
         self.children = children if children is not None else []
@@ -22,51 +40,58 @@ class ShiftReduceParser:
         self.grammar = {}
         self.grammar_reverse_lookup = {}
         self.start_symbol = ''
+        # Symbols are interned to small ints; the automaton and the parse-time
+        # stacks work on ids, and _id2sym is only consulted for display
+        self._sym2id = {'$': 0}
+        self._id2sym = ['$']
+        self._start_id = 0
+        self._goto = {} # (state, symbol id) -> next state; missing keys go to state 0
+        self._reductions = [] # state -> longest (lhs id, rhs ids) reductions available
         self._load_grammar(grammar_filename)
         
         # State variables for a specific parse run
         self.parsing_stack = []
+        self.state_stack = [] # Automaton state after each parsing_stack entry
         self.node_stack = []
         self.input_buffer = []
+        self.input_pos = 0
         self.parsing_table_rows = []
+        self._display_symbols = self._id2sym # _id2sym plus this run's unknown tokens
 
     def _load_grammar(self, filename):
         """(Internal) Reads and processes grammar rules from a file."""
         try:
-            with open(filename, 'r') as f:
-                first_line = True
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith('#'):
-                        continue
-                    
-                    parts = line.split('->')
-                    if len(parts) != 2:
-                        print(f"Skipping malformed line: {line}")
-                        continue
-                    
-                    lhs = parts[0].strip()
-                    rhs_productions = parts[1].strip().split('|')
+            with open(filename, 'rb') as f:
+                data = f.read()
+
+            first_line = True
+            # One regex pass yields the stripped, non-blank, non-comment lines
+            for line in GRAMMAR_LINE_PATTERN.findall(data.decode()):
+                lhs, separator, rhs = line.partition('->')
+                if not separator or '->' in rhs:
+                    print(f"Skipping malformed line: {line}")
+                    continue
+                
+                lhs = lhs.strip()
+                
+                if first_line:
+                    self.start_symbol = lhs
+                    first_line = False
                     
-                    if first_line:
-                        self.start_symbol = lhs
-                        first_line = False
+                productions = self.grammar.setdefault(lhs, [])
+                
+                for prod_str in rhs.split('|'):
+                    symbols = tuple(prod_str.split()) # Empty tuple is epsilon
                         
-                    if lhs not in self.grammar:
-                        self.grammar[lhs] = []
+                    productions.append(symbols)
                     
-                    for prod_str in rhs_productions:
-                        symbols = tuple(prod_str.strip().split())
-                        if symbols == ('',):
-                            symbols = () # Epsilon
-                            
-                        self.grammar[lhs].append(symbols)
-                        
-                        if symbols in self.grammar_reverse_lookup:
-                            self.grammar_reverse_lookup[symbols].append(lhs)
-                        else:
-                            self.grammar_reverse_lookup[symbols] = [lhs]
+                    if symbols in self.grammar_reverse_lookup:
+                        self.grammar_reverse_lookup[symbols].append(lhs)
+                    else:
+                        self.grammar_reverse_lookup[symbols] = [lhs]
             
+            self._build_automaton()
+
             print("--- 1. Grammar Rules Read ---")
             print(f"Start Symbol: {self.start_symbol}")
             for lhs, rhs_list in self.grammar.items():
@@ -77,35 +102,122 @@ class ShiftReduceParser:
             print(f"Error: Grammar file '{filename}' not found.")
             sys.exit(1)
 
+    def _intern(self, symbol):
+        """(Internal) Returns the int id of a symbol, assigning a new one if unseen."""
+        symbol_id = self._sym2id.get(symbol)
+        if symbol_id is None:
+            symbol_id = self._sym2id[symbol] = len(self._id2sym)
+            self._id2sym.append(symbol)
+        return symbol_id
+
+    def _tokenize(self, input_string):
+        """
+        (Internal) Converts the input to symbol ids followed by '$'. Tokens the
+        grammar doesn't know get ids past the interned ones for this run only,
+        so the compiled tables never grow.
+        """
+        unknown_tokens = {}
+        input_buffer = []
+        for token in input_string.strip().split():
+            symbol_id = self._sym2id.get(token)
+            if symbol_id is None:
+                symbol_id = unknown_tokens.setdefault(token, len(self._id2sym) + len(unknown_tokens))
+            input_buffer.append(symbol_id)
+        input_buffer.append(0) # '$'
+
+        self._display_symbols = self._id2sym + list(unknown_tokens) if unknown_tokens else self._id2sym
+        return input_buffer
+
+    def _build_automaton(self):
+        """
+        (Internal) Compiles the productions into a DFA over stack symbols.
+
+        The state reached after reading the stack (above '$') identifies every
+        production whose RHS is a suffix of the stack, so each parse step is a
+        table lookup instead of a suffix search. This is an Aho-Corasick
+        automaton with the RHS tuples as patterns.
+        """
+        intern = self._intern
+        self._start_id = intern(self.start_symbol)
+
+        # 1. Build a trie of the RHS tuples
+        trie = [{}]     # state -> {symbol id: child state}
+        matches = [[]]  # state -> (lhs, rhs) productions ending exactly here
+        alphabet = set()
+        for rhs, lhs_list in self.grammar_reverse_lookup.items():
+            if not rhs:
+                continue # Epsilon productions are never reduced
+            rhs = tuple(map(intern, rhs))
+            alphabet.update(rhs)
+            state = 0
+            for symbol in rhs:
+                if symbol not in trie[state]:
+                    trie.append({})
+                    matches.append([])
+                    trie[state][symbol] = len(trie) - 1
+                state = trie[state][symbol]
+            matches[state].extend((intern(lhs), rhs) for lhs in lhs_list)
+
+        # 2. Breadth-first, compute failure links (longest proper suffix that is
+        # also a trie path) and fill in the full DFA. Policy: Prefer the longest
+        # possible reduction. A state's own matches are as long as its trie
+        # path, so they win outright; otherwise the longest match is found by
+        # following the failure link, whose state is already resolved.
+        alphabet.update(map(intern, self.grammar))
+        fail = [0] * len(trie)
+        goto = {}
+        order = [0]
+        for state in order:
+            for symbol in alphabet:
+                child = trie[state].get(symbol)
+                if child is None:
+                    target = goto.get((fail[state], symbol), 0) if state else 0
+                    if target:
+                        goto[(state, symbol)] = target
+                    continue
+                goto[(state, symbol)] = child
+                fail[child] = goto.get((fail[state], symbol), 0) if state else 0
+                if not matches[child]:
+                    matches[child] = matches[fail[child]]
+                order.append(child)
+
+        self._reductions = matches
+        self._goto = goto
+
     def _shift(self, input_symbol):
         """(Internal) Performs the shift action."""
+        self.state_stack.append(self._goto.get((self.state_stack[-1], input_symbol), 0))
         self.parsing_stack.append(input_symbol)
-        self.node_stack.append(ParseTreeNode(input_symbol))
-        self.input_buffer.pop(0)
+        self.node_stack.append(ParseTreeNode(self._display_symbols[input_symbol]))
+        self.input_pos += 1 # Advance the cursor instead of pop(0), which is O(n)
 
     def _reduce(self, lhs, rhs_symbols):
         """(Internal) Performs the reduce action."""
-        # Update parsing stack
-        for _ in range(len(rhs_symbols)):
-            if self.parsing_stack: self.parsing_stack.pop()
-        self.parsing_stack.append(lhs)
-        
-        # Update node stack to build the tree
+        k = len(rhs_symbols)
         child_nodes = []
-        for _ in range(len(rhs_symbols)):
-            if self.node_stack: child_nodes.append(self.node_stack.pop())
-        child_nodes.reverse()
+        if k: # Guard epsilon: a [-0:] slice would cover the whole stack
+            # Update node stack to build the tree (slice is already in order)
+            child_nodes = self.node_stack[-k:]
+            del self.node_stack[-k:]
+            # Update parsing and state stacks
+            del self.parsing_stack[-k:]
+            del self.state_stack[-k:]
+        self.parsing_stack.append(lhs)
+        self.state_stack.append(self._goto.get((self.state_stack[-1], lhs), 0))
         
-        parent_node = ParseTreeNode(lhs, children=child_nodes)
+        parent_node = ParseTreeNode(self._id2sym[lhs], children=child_nodes)
         self.node_stack.append(parent_node)
 
-    def parse(self, input_string):
+    def parse(self, input_string, trace=True):
         """
         Parses a given input string, then prints all results.
+        With trace=False the step-by-step parsing table is not built or printed.
         """
         # 1. Reset state for the new run
-        self.input_buffer = input_string.strip().split() + ['$']
-        self.parsing_stack = ['$']
+        self.input_buffer = self._tokenize(input_string)
+        self.input_pos = 0
+        self.parsing_stack = [0] # '$'
+        self.state_stack = [0]
         self.node_stack = []
         self.parsing_table_rows = []
         step = 1
@@ -114,92 +226,102 @@ class ShiftReduceParser:
         status = "Unknown"
         tree = None
 
+        # Bind the hot attributes to locals; the loop only mutates these lists
+        parsing_stack = self.parsing_stack
+        state_stack = self.state_stack
+        input_buffer = self.input_buffer
+        reductions = self._reductions
+        id2sym = self._display_symbols
+        add_row = self.parsing_table_rows.append
+
         while True:
-            stack_str = " ".join(self.parsing_stack)
-            input_str = " ".join(self.input_buffer)
-            # Row format: [Step, Stack, Input, Action, Rule]
-            current_row = [str(step), stack_str, input_str, "", ""]
-
-            # 2. Find all possible reductions
-            potential_reductions = []
-            temp_suffix = []
-            for i in range(len(self.parsing_stack) - 1, 0, -1):
-                temp_suffix.insert(0, self.parsing_stack[i])
-                suffix_tuple = tuple(temp_suffix)
-                if suffix_tuple in self.grammar_reverse_lookup:
-                    for lhs in self.grammar_reverse_lookup[suffix_tuple]:
-                        potential_reductions.append((lhs, suffix_tuple))
+            if trace:
+                stack_str = " ".join([id2sym[i] for i in parsing_stack])
+                input_str = " ".join([id2sym[i] for i in input_buffer[self.input_pos:]])
+                # Row format: (Step, Stack, Input, Action, Rule)
+
+            if step > 100: # Safety break
+                if trace:
+                    add_row((step, stack_str, input_str, "Reject (Loop Limit)", "Over 100 steps"))
+                status = "Rejected (Loop Limit)"
+                tree = None
+                break # End of parse
+
+            # 2. Look up the longest reductions for the current automaton state
+            longest_reductions = reductions[state_stack[-1]]
 
             # 3. Decision logic
-            can_shift = len(self.input_buffer) > 0 and self.input_buffer[0] != '$'
+            lookahead = input_buffer[self.input_pos]
+            can_shift = lookahead != 0 # '$'
 
-            if not potential_reductions:
+            if not longest_reductions:
                 if can_shift: # Must shift
-                    symbol_to_shift = self.input_buffer[0]
-                    current_row[3:5] = ["Shift", f"Shift {symbol_to_shift}"]
-                    self.parsing_table_rows.append(current_row)
+                    symbol_to_shift = lookahead
+                    if trace:
+                        add_row((step, stack_str, input_str, "Shift", f"Shift {id2sym[symbol_to_shift]}"))
                     self._shift(symbol_to_shift)
                 else: # Check for accept or reject
-                    if stack_str == f"$ {self.start_symbol}" and input_str == "$":
-                        current_row[3] = "Accept"
-                        self.parsing_table_rows.append(current_row)
+                    if (len(parsing_stack) == 2 and parsing_stack[1] == self._start_id
+                            and self.input_pos == len(input_buffer) - 1):
+                        if trace:
+                            add_row((step, stack_str, input_str, "Accept", ""))
                         status = "Accepted"
                         tree = self.node_stack[0]
                         break # End of parse
                     else:
-                        current_row[3] = "Reject (Error)"
-                        self.parsing_table_rows.append(current_row)
+                        if trace:
+                            add_row((step, stack_str, input_str, "Reject (Error)", ""))
                         status = "Rejected (Invalid State)"
                         tree = None
                         break # End of parse
             else:
-                # Policy: Prefer the longest possible reduction
-                max_len = max(len(rhs) for _, rhs in potential_reductions)
-                longest_reductions = [r for r in potential_reductions if len(r[1]) == max_len]
-
                 if len(longest_reductions) > 1: # Reduce-Reduce Conflict
-                    rules = ", ".join([f"{l}->{' '.join(r)}" for l, r in longest_reductions])
-                    current_row[3:5] = ["Reduce-Reduce Conflict", f"Rules: [{rules}]"]
-                    self.parsing_table_rows.append(current_row)
+                    if trace:
+                        rules = ", ".join([f"{id2sym[l]}->{' '.join([id2sym[i] for i in r])}"
+                                           for l, r in longest_reductions])
+                        add_row((step, stack_str, input_str, "Reduce-Reduce Conflict", f"Rules: [{rules}]"))
                     status = "Rejected (Conflict)"
                     tree = None
                     break # End of parse
 
                 # Perform the reduction
                 lhs, rhs_symbols = longest_reductions[0]
-                action = "Reduce"
-                rule_str = f"{lhs} -> {' '.join(rhs_symbols) or 'ε'}"
+                if trace:
+                    action = "Reduce"
+                    rule_str = f"{id2sym[lhs]} -> {' '.join([id2sym[i] for i in rhs_symbols]) or 'ε'}"
 
-                if can_shift: # Shift-Reduce Conflict (resolved by reducing)
-                    action = "Reduce (S/R Conflict)"
-                
-                current_row[3:5] = [action, rule_str]
-                self.parsing_table_rows.append(current_row)
+                    if can_shift: # Shift-Reduce Conflict (resolved by reducing)
+                        action = "Reduce (S/R Conflict)"
+                    
+                    add_row((step, stack_str, input_str, action, rule_str))
                 self._reduce(lhs, rhs_symbols)
 
             step += 1
-            if step > 100: # Safety break
-                current_row[3:5] = ["Reject (Loop Limit)", "Over 100 steps"]
-                self.parsing_table_rows.append(current_row)
-                status = "Rejected (Loop Limit)"
-                tree = None
-                break # End of parse
         
         # After the loop, display the results
-        self._display_results(status, tree)
+        self._display_results(status, tree, trace)
 
-    def _print_tree_recursive(self, node, prefix):
-        """Internal recursive helper for printing the tree."""
-        children = node.children
-        num_children = len(children)
-        
-        for i, child in enumerate(children):
-            is_last = (i == num_children - 1)
+    def _format_tree_lines(self, root_node):
+        """Internal helper that renders the tree as lines, using an explicit stack."""
+        out = [f"└── {root_node.value}\n"]
+        # Entries are (node, prefix, is_last); children are pushed in reverse so
+        # they pop off in their original order
+        stack = []
+        num_children = len(root_node.children)
+        for i in range(num_children - 1, -1, -1):
+            stack.append((root_node.children[i], "    ", i == num_children - 1))
+
+        while stack:
+            node, prefix, is_last = stack.pop()
             connector = "└── " if is_last else "├── "
-            print(f"{prefix}{connector}{child.value}")
-            
-            child_prefix = "    " if is_last else "│   "
-            self._print_tree_recursive(child, prefix + child_prefix)
+            out.append(f"{prefix}{connector}{node.value}\n")
+
+            child_prefix = prefix + ("    " if is_last else "│   ")
+            children = node.children
+            num_children = len(children)
+            for i in range(num_children - 1, -1, -1):
+                stack.append((children[i], child_prefix, i == num_children - 1))
+        return out
 
     def _print_parse_tree(self, root_node):
         """Prints the final parse tree in a structured format."""
@@ -208,18 +330,48 @@ class ShiftReduceParser:
             print("No parse tree generated.")
             return
         
-        print(f"└── {root_node.value}")
-        self._print_tree_recursive(root_node, "    ")
-
-    def _display_results(self, status, parse_tree):
-        """Prints the final parsing table, result, and parse tree."""
-        # Print Table using tabulate
-        print("\n--- Shift-Reduce Parsing Table ---")
-        if not self.parsing_table_rows:
-            print("No parsing steps were taken.")
-        else:
-            headers = ['Step', 'Stack', 'Input String', 'Action', 'Associative Rule']
-            print(tabulate(self.parsing_table_rows, headers=headers, tablefmt="grid"))
+        # One buffered write instead of a print call per node
+        sys.stdout.write("".join(self._format_tree_lines(root_node)))
+
+    def _format_table_lines(self, headers, rows):
+        """
+        Internal helper that renders rows as a grid table. The first column
+        (the step number) is right-aligned, the rest left-aligned. Cells are
+        measured and padded by display width, so wide symbols stay aligned.
+        """
+        rows = [(str(row[0]),) + row[1:] for row in rows]
+        # Headers get two extra columns of room, matching the usual grid layout
+        widths = [display_width(header) + 2 for header in headers]
+        for row in rows:
+            for i, cell in enumerate(row):
+                cell_width = display_width(cell)
+                if cell_width > widths[i]:
+                    widths[i] = cell_width
+
+        border = "+" + "+".join(["-" * (w + 2) for w in widths]) + "+\n"
+        header_border = "+" + "+".join(["=" * (w + 2) for w in widths]) + "+\n"
+
+        def format_row(cells):
+            parts = [" " * (widths[0] - display_width(cells[0])) + cells[0]]
+            parts.extend(cell + " " * (w - display_width(cell)) for cell, w in zip(cells[1:], widths[1:]))
+            return "| " + " | ".join(parts) + " |\n"
+
+        out = [border, format_row(headers), header_border]
+        for row in rows:
+            out.append(format_row(row))
+            out.append(border)
+        return out
+
+    def _display_results(self, status, parse_tree, trace=True):
+        """Prints the final parsing table (if traced), result, and parse tree."""
+        # Print Table
+        if trace:
+            print("\n--- Shift-Reduce Parsing Table ---")
+            if not self.parsing_table_rows:
+                print("No parsing steps were taken.")
+            else:
+                headers = ('Step', 'Stack', 'Input String', 'Action', 'Associative Rule')
+                sys.stdout.write("".join(self._format_table_lines(headers, self.parsing_table_rows)))
 
         # Print Final Result
         print("\n--- Final Result ---")